@@ -4,6 +4,7 @@ from .pipeline.svg_loader import load_svg_as_polylines
 from .pipeline.dxf_loader import load_dxf_as_polylines
 from .pipeline.gcode_generator import polylines_to_gcode, save_gcode
 from .utils.serial_utils import list_serial_ports
+from .utils import profiling
 
 def main(argv=None):
     parser = argparse.ArgumentParser(description="LaserMX CLI")
@@ -14,6 +15,9 @@ def main(argv=None):
     parser.add_argument("--file", help="Archivo SVG o DXF a convertir.")
     parser.add_argument("--to-gcode", help="Ruta de salida para G-code.")
     parser.add_argument("--run", action="store_true", help="Enviar el G-code al controlador tras convertir.")
+    parser.add_argument("--profile", action="store_true", help="Medir cada etapa de la conversión e imprimir un resumen.", default=False)
+    parser.add_argument("--profile-memory", action="store_true", help="Medir memoria por etapa con tracemalloc (infla los tiempos). Implica --profile.", default=False)
+    parser.add_argument("--profile-trace", help="Guardar las mediciones en JSON (formato Chrome Trace). Implica --profile.")
     parser.add_argument(
         "--gui",
         action="store_true",
@@ -61,6 +65,9 @@ def main(argv=None):
         drv.send_command(args.cmd); time.sleep(0.5); drv.disconnect(); return 0
 
     if args.file:
+        profile = args.profile or args.profile_memory or bool(args.profile_trace)
+        if profile:
+            profiling.enable(trace_memory=args.profile_memory)
         if args.file.lower().endswith(".svg"):
             polys = load_svg_as_polylines(args.file)
         elif args.file.lower().endswith(".dxf"):
@@ -70,6 +77,12 @@ def main(argv=None):
         g = polylines_to_gcode(polys)
         if args.to_gcode:
             save_gcode(g, args.to_gcode); print(f"G-code guardado en {args.to_gcode}")
+        if profile:
+            print(profiling.summary_table(), file=sys.stderr)
+            if args.profile_trace:
+                profiling.write_chrome_trace(args.profile_trace)
+                print(f"Traza de profiling guardada en {args.profile_trace}", file=sys.stderr)
+            profiling.disable()
         if args.run:
             if not args.port:
                 print("Debe especificar --port para --run", file=sys.stderr); return 2
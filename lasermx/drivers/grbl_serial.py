@@ -4,19 +4,28 @@ Driver serial GRBL (no bloqueante) para LaserMX.
 - Conecta/desconecta
 - Envía líneas de G-code/comandos
 - Lee respuestas en un hilo y las pasa a un callback
+- Envía trabajos completos con protocolo envío-respuesta (espera "ok" por línea)
 """
 from __future__ import annotations
 import threading
 import time
-from typing import Optional, Callable
+from typing import Optional, Callable, Iterable
 import serial
 
+class StreamAborted(RuntimeError):
+    """El envío se interrumpió (``abort_stream()`` o desconexión) antes de terminar."""
+
 class GrblSerialDriver:
     def __init__(self, on_line: Optional[Callable[[str], None]] = None):
         self.on_line = on_line or (lambda s: None)
         self._ser: Optional[serial.Serial] = None
         self._rx_thread: Optional[threading.Thread] = None
         self._stop = threading.Event()
+        self._ack = threading.Event()
+        self._tx_lock = threading.Lock()
+        self._abort = threading.Event()
+        self._streaming = False
+        self._last_rx = 0.0
 
     def connect(self, port: str, baud: int = 115200, timeout: float = 1.0) -> None:
         self._ser = serial.Serial(port, baudrate=baud, timeout=timeout)
@@ -45,6 +54,9 @@ class GrblSerialDriver:
             try:
                 line = self._ser.readline().decode(errors="ignore").strip()
                 if line:
+                    self._last_rx = time.monotonic()
+                    if line == "ok" or line.startswith("error"):
+                        self._ack.set()
                     self.on_line(line)
             except Exception:
                 break
@@ -53,10 +65,80 @@ class GrblSerialDriver:
         if not self._ser:
             raise RuntimeError("No conectado")
         data = (line.strip() + "\n").encode("ascii", errors="ignore")
-        self._ser.write(data)
-        self._ser.flush()
+        with self._tx_lock:
+            self._ser.write(data)
+            self._ser.flush()
+
+    def send_realtime(self, ch: str) -> None:
+        """Envía un comando en tiempo real de GRBL ('?', '!', '~') sin salto de línea.
+
+        No genera "ok", así que puede usarse durante un stream sin desfasar las confirmaciones.
+        """
+        if not self._ser:
+            raise RuntimeError("No conectado")
+        with self._tx_lock:
+            self._ser.write(ch.encode("ascii", errors="ignore")[:1])
+
+    def stream_gcode(self, lines: Iterable[str], delay: float = 0.0, timeout: Optional[float] = None) -> int:
+        """
+        Envía G-code línea por línea esperando "ok"/"error" de cada una (bloqueante).
+
+        Las líneas vacías se omiten. Devuelve cuántas líneas se enviaron.
+        Pensado para correr en un hilo propio; ``abort_stream()`` lo detiene
+        y entonces se lanza ``StreamAborted``.
+
+        Con el planner lleno, el "ok" llega recién cuando termina el movimiento más
+        viejo, que a feed bajo puede tardar minutos: por eso no hay timeout por
+        defecto. ``timeout`` cuenta segundos sin *ninguna* línea de GRBL (los
+        reportes de estado también lo reinician). Si se abandona el envío (abort
+        o timeout) se manda un soft-reset para que la máquina no siga cortando.
+        """
+        if not self._ser:
+            raise RuntimeError("No conectado")
+        self._abort.clear()
+        self._streaming = True
+        sent = 0
+        try:
+            for ln in lines:
+                ln = ln.strip()
+                if not ln:
+                    continue
+                if self._abort.is_set() or self._stop.is_set():
+                    raise StreamAborted(f"Envío abortado tras {sent} líneas")
+                self._ack.clear()
+                self.send_command(ln)
+                sent += 1
+                self._last_rx = time.monotonic()
+                while not self._ack.wait(0.25):
+                    if timeout is not None and time.monotonic() - self._last_rx > timeout:
+                        self._soft_reset()
+                        raise TimeoutError(f"Sin respuesta de GRBL para: {ln}")
+                if self._abort.is_set() or self._stop.is_set():
+                    # el ack pudo ser el que fuerza abort_stream(), no un "ok" real
+                    raise StreamAborted(f"Envío abortado tras {sent} líneas")
+                if delay:
+                    time.sleep(delay)
+        finally:
+            self._streaming = False
+        return sent
+
+    def abort_stream(self) -> None:
+        """Corta un ``stream_gcode`` en curso y detiene la máquina (soft-reset)."""
+        if self._streaming:
+            self._soft_reset()
+        self._abort.set()
+        self._ack.set()
+
+    def _soft_reset(self) -> None:
+        # Ctrl-X: GRBL detiene el movimiento, apaga el láser y vacía el planner
+        try:
+            self.send_realtime("\x18")
+        except Exception:
+            pass
 
     def disconnect(self) -> None:
+        # abortar antes de cerrar para que el soft-reset alcance a salir
+        self.abort_stream()
         self._stop.set()
         if self._rx_thread and self._rx_thread.is_alive():
             self._rx_thread.join(timeout=1.0)
@@ -64,4 +146,4 @@ class GrblSerialDriver:
             try:
                 self._ser.close()
             finally:
-                self._ser = None
\ No newline at end of file
+                self._ser = None
@@ -1,13 +1,20 @@
 from __future__ import annotations
+import threading
 from PySide6 import QtWidgets, QtCore, QtGui
 from typing import List
-from ..drivers.grbl_serial import GrblSerialDriver
+from ..drivers.grbl_serial import GrblSerialDriver, StreamAborted
 from ..utils.serial_utils import list_serial_ports
 from ..pipeline.svg_loader import load_svg_as_polylines
 from ..pipeline.dxf_loader import load_dxf_as_polylines
 from ..pipeline.gcode_generator import polylines_to_gcode, save_gcode
+from ..pipeline.toolpath_index import ProgressTracker, ToolpathIndex
+from .progress_overlay import ToolpathOverlay
 
 class MainWindow(QtWidgets.QMainWindow):
+    line_signal = QtCore.Signal(str)
+    job_ready = QtCore.Signal(object)
+    stream_finished = QtCore.Signal(str, str)  # estado ("ok"/"aborted"/"error"), detalle
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("LaserMX v0.1")
@@ -43,6 +50,18 @@ class MainWindow(QtWidgets.QMainWindow):
 
         self.current_polys: List[List[tuple[float,float]]] = []
 
+        # avance en vivo: el tracker se alimenta desde el hilo serial, el overlay refresca a 10 Hz
+        self.tracker = ProgressTracker()
+        self.overlay = ToolpathOverlay(self.scene, self.tracker, interval_ms=100, parent=self)
+        self._stream_thread: threading.Thread | None = None
+        self._status_timer = QtCore.QTimer(self)
+        self._status_timer.setInterval(50)  # '?' a 20 Hz mientras corre un trabajo
+        self._status_timer.timeout.connect(self._poll_status)
+        self.job_ready.connect(self._on_job_ready)
+        self.stream_finished.connect(self._on_stream_finished)
+        self.overlay.finished.connect(self._on_job_done)
+        self.line_signal.connect(self._log)
+
         self.refresh_btn.clicked.connect(self._refresh_ports)
         self.connect_btn.clicked.connect(self._toggle_connection)
         self.send_btn.clicked.connect(self._send_cmd)
@@ -105,14 +124,63 @@ class MainWindow(QtWidgets.QMainWindow):
         if not self.current_polys:
             QtWidgets.QMessageBox.information(self, "Aviso", "No hay trayectorias cargadas.")
             return
+        if self._stream_thread is not None and self._stream_thread.is_alive():
+            QtWidgets.QMessageBox.information(self, "Aviso", "Ya hay un trabajo en curso.")
+            return
+        self._stream_thread = threading.Thread(
+            target=self._stream_worker, args=(list(self.current_polys),), daemon=True)
+        self._stream_thread.start()
+        self._log("Preparando G-code...")
+
+    def _stream_worker(self, polys):
+        # corre fuera del hilo de la GUI (generar + indexar un trabajo grande tarda segundos);
+        # solo se comunica con la GUI por señales
         try:
-            g = polylines_to_gcode(self.current_polys, feed=1000.0, power_s=800)
+            g = polylines_to_gcode(polys, feed=1000.0, power_s=800)
+            index = ToolpathIndex.from_gcode(g)
+            # armar antes de enviar para no perder ningún "ok"
+            self.tracker.arm()
+            self.job_ready.emit(index)
             self.driver.stream_gcode(g, delay=0.0)
-            self._log("G-code enviado al controlador.")
+            self.tracker.mark_stream_done()
+            self.stream_finished.emit("ok", "")
+        except StreamAborted as e:
+            self.stream_finished.emit("aborted", str(e))
         except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Error", str(e))
+            self.stream_finished.emit("error", str(e))
+
+    def _on_job_ready(self, index: ToolpathIndex):
+        self.overlay.start(index)
+        self._status_timer.start()
+        self._log(f"Enviando G-code al controlador ({index.line_count} líneas)...")
+
+    def _on_stream_finished(self, status: str, detail: str):
+        if status == "ok":
+            # GRBL aún tiene movimientos en el planner: seguir consultando '?' hasta
+            # que reporte Idle (el overlay emite finished y se llama a _on_job_done)
+            self._log("G-code enviado al controlador; esperando que termine el trabajo...")
+            return
+        self._status_timer.stop()
+        self.overlay.stop()
+        self.tracker.disarm()
+        if status == "aborted":
+            self._log(f"⚠️ Trabajo interrumpido: {detail}")
+        else:
+            QtWidgets.QMessageBox.critical(self, "Error", detail)
+
+    def _on_job_done(self):
+        self._status_timer.stop()
+        self.tracker.disarm()
+        self._log("Trabajo terminado.")
+
+    def _poll_status(self):
+        try:
+            self.driver.send_realtime("?")
+        except Exception:
+            self._status_timer.stop()
 
     def _draw_preview(self, polys):
+        self.overlay.reset()
         self.scene.clear()
         pen = QtGui.QPen()
         for pts in polys:
@@ -126,7 +194,12 @@ class MainWindow(QtWidgets.QMainWindow):
         self.view.fitInView(self.scene.itemsBoundingRect(), QtCore.Qt.KeepAspectRatio)
 
     def _on_grbl_line(self, text: str):
-        self._log(text)
+        # Llega desde el hilo lector serial: solo el tracker se actualiza aquí,
+        # el log se actualiza en el hilo de la GUI vía señal.
+        self.tracker.feed(text)
+        if self.tracker.armed and (text == "ok" or text.startswith("<")):
+            return  # no inundar el log con un "ok" por línea ni con los reportes a 20 Hz
+        self.line_signal.emit(text)
 
     def _log(self, msg: str):
         self.log.appendPlainText(msg)
\ No newline at end of file
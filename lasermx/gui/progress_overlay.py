@@ -0,0 +1,129 @@
+"""
+Overlay de avance en vivo sobre la vista previa 2D.
+
+- ``ProgressTracker`` (en ``pipeline.toolpath_index``): recibe las líneas de GRBL
+  desde el hilo del driver. Solo cuenta "ok"/"error" y guarda la última posición;
+  no toca Qt ni la geometría, así el hilo de streaming no paga el costo del dibujo.
+- ``ToolpathOverlay``: en el hilo de la GUI, con un QTimer de frecuencia acotada,
+  convierte el estado del tracker en segmentos completados usando un
+  ``ToolpathIndex`` y repinta solo los bloques de segmentos que cambiaron.
+"""
+from __future__ import annotations
+from typing import List, Optional
+from PySide6 import QtCore, QtGui, QtWidgets
+from ..pipeline.toolpath_index import ProgressTracker, ToolpathIndex, advance_progress
+
+
+class ToolpathOverlay(QtCore.QObject):
+    # se emite una vez cuando el tracker confirma que la máquina terminó (Idle)
+    finished = QtCore.Signal()
+    # segmentos por item gráfico: cada refresco reconstruye como mucho los bloques tocados
+    CHUNK = 4096
+
+    def __init__(self, scene: QtWidgets.QGraphicsScene, tracker: ProgressTracker,
+                 interval_ms: int = 100, parent: Optional[QtCore.QObject] = None) -> None:
+        super().__init__(parent)
+        self.scene = scene
+        self.tracker = tracker
+        self.index: Optional[ToolpathIndex] = None
+        self._items: List[Optional[QtWidgets.QGraphicsPathItem]] = []
+        self._head: Optional[QtWidgets.QGraphicsEllipseItem] = None
+        self._done = 0          # segmentos completos (monótono)
+        self._frac = 0.0        # fracción recorrida del segmento actual
+        self._pen = QtGui.QPen(QtGui.QColor(0, 170, 80))
+        self._pen.setWidth(2)
+        self._pen.setCosmetic(True)
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self.refresh)
+
+    def start(self, index: ToolpathIndex) -> None:
+        self.reset()
+        self.index = index
+        self._items = [None] * ((index.segment_count + self.CHUNK - 1) // self.CHUNK)
+        self._head = QtWidgets.QGraphicsEllipseItem(-4, -4, 8, 8)
+        self._head.setBrush(QtGui.QColor(220, 40, 40))
+        self._head.setPen(QtGui.QPen(QtCore.Qt.NoPen))
+        # tamaño fijo en pantalla, independiente del zoom
+        self._head.setFlag(QtWidgets.QGraphicsItem.ItemIgnoresTransformations)
+        self._head.setZValue(2)
+        self.scene.addItem(self._head)
+        self._timer.start()
+
+    def stop(self) -> None:
+        """Último refresco y se congela el estado (p.ej. si el envío se abortó)."""
+        self._timer.stop()
+        self.refresh()
+
+    def reset(self) -> None:
+        """Quita los items del overlay; llamar antes de ``scene.clear()``."""
+        self._timer.stop()
+        for it in self._items:
+            if it is not None:
+                self.scene.removeItem(it)
+        if self._head is not None:
+            self.scene.removeItem(self._head)
+        self._items = []
+        self._head = None
+        self.index = None
+        self._done = 0
+        self._frac = 0.0
+
+    def refresh(self) -> None:
+        idx = self.index
+        if idx is None:
+            return
+        tr = self.tracker
+        finished = tr.finished
+        done, frac = advance_progress(idx, tr.acked, tr.pos, self._done, self._frac, finished)
+        if (done, frac) == (self._done, self._frac):
+            if finished:
+                self._finish()
+            return
+        first = self._done // self.CHUNK
+        last = min(done // self.CHUNK, len(self._items) - 1)
+        self._done, self._frac = done, frac
+        for c in range(first, last + 1):
+            self._rebuild_chunk(c)
+        if self._head is not None:
+            x, y = idx.point_at(done, frac) if done < idx.segment_count else (idx.xs[-1], idx.ys[-1])
+            self._head.setPos(x, -y)
+        if finished:
+            self._finish()
+
+    def _finish(self) -> None:
+        if self._timer.isActive():
+            self._timer.stop()
+            self.finished.emit()
+
+    def _rebuild_chunk(self, c: int) -> None:
+        idx = self.index
+        assert idx is not None
+        xs, ys, cut = idx.xs, idx.ys, idx.cut
+        start = c * self.CHUNK
+        end = min(start + self.CHUNK, self._done)
+        path = QtGui.QPainterPath()
+        pen_down = False
+        for k in range(start, end):
+            if cut[k]:
+                if not pen_down:
+                    path.moveTo(xs[k], -ys[k])
+                    pen_down = True
+                path.lineTo(xs[k + 1], -ys[k + 1])
+            else:
+                pen_down = False
+        if (self._frac > 0.0 and start <= self._done < start + self.CHUNK
+                and self._done < len(cut) and cut[self._done]):
+            k = self._done
+            if not pen_down:
+                path.moveTo(xs[k], -ys[k])
+            x, y = idx.point_at(k, self._frac)
+            path.lineTo(x, -y)
+        it = self._items[c]
+        if it is None:
+            it = self.scene.addPath(path, self._pen)
+            it.setZValue(1)
+            self._items[c] = it
+        else:
+            # setPath invalida solo el área del bloque, no toda la escena
+            it.setPath(path)
@@ -1,21 +1,27 @@
 from __future__ import annotations
 from typing import List, Tuple
 import ezdxf
+from ..utils.profiling import stage
 
 Point = Tuple[float, float]
 Polyline = List[Point]
 
 def load_dxf_as_polylines(path: str) -> List[Polyline]:
-    doc = ezdxf.readfile(path)
+    with stage("dxf.read"):
+        doc = ezdxf.readfile(path)
     msp = doc.modelspace()
     polylines: List[Polyline] = []
-    for e in msp:
-        if e.dxftype() == "LINE":
-            polylines.append([(e.dxf.start.x, e.dxf.start.y), (e.dxf.end.x, e.dxf.end.y)])
-        elif e.dxftype() in ("LWPOLYLINE", "POLYLINE"):
-            pts = [(p[0], p[1]) for p in e.get_points()]
-            polylines.append(pts)
-        elif e.dxftype() == "SPLINE":
-            pts = [(p[0], p[1]) for p in e.approximate(100)]
-            polylines.append(pts)
+    with stage("dxf.iterate") as sp:
+        entities = 0
+        for e in msp:
+            entities += 1
+            if e.dxftype() == "LINE":
+                polylines.append([(e.dxf.start.x, e.dxf.start.y), (e.dxf.end.x, e.dxf.end.y)])
+            elif e.dxftype() in ("LWPOLYLINE", "POLYLINE"):
+                pts = [(p[0], p[1]) for p in e.get_points()]
+                polylines.append(pts)
+            elif e.dxftype() == "SPLINE":
+                pts = [(p[0], p[1]) for p in e.approximate(100)]
+                polylines.append(pts)
+        sp.count(entities=entities, paths=len(polylines), points=sum(len(p) for p in polylines))
     return polylines
\ No newline at end of file
@@ -1,20 +1,25 @@
 from __future__ import annotations
 from typing import List, Tuple
 from svgpathtools import svg2paths2
+from ..utils.profiling import stage
 
 Point = Tuple[float, float]
 Polyline = List[Point]
 
 def load_svg_as_polylines(path: str, samples_per_curve: int = 50) -> List[Polyline]:
-    paths, attrs, svg_attr = svg2paths2(path)
+    with stage("svg.parse") as sp:
+        paths, attrs, svg_attr = svg2paths2(path)
+        sp.count(paths=len(paths))
     polylines: List[Polyline] = []
-    for p in paths:
-        pts: List[Point] = []
-        length = p.length(error=1e-4)
-        n = max(2, min(1000, int(samples_per_curve * (length + 1e-6))))
-        for i in range(n + 1):
-            t = i / n
-            z = p.point(t)
-            pts.append((z.real, z.imag))
-        polylines.append(pts)
+    with stage("svg.sample") as sp:
+        for p in paths:
+            pts: List[Point] = []
+            length = p.length(error=1e-4)
+            n = max(2, min(1000, int(samples_per_curve * (length + 1e-6))))
+            for i in range(n + 1):
+                t = i / n
+                z = p.point(t)
+                pts.append((z.real, z.imag))
+            polylines.append(pts)
+        sp.count(paths=len(polylines), points=sum(len(p) for p in polylines))
     return polylines
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Índice línea → segmento para seguir el avance de un trabajo G-code.
+
+Se construye una sola vez antes de enviar el trabajo y permite:
+- Saber cuántos segmentos quedan cubiertos tras N líneas confirmadas ("ok").
+- Ubicar una posición reportada por GRBL (MPos) sobre la geometría, buscando
+  solo en una ventana acotada de segmentos (O(ventana), no O(total)).
+- Calcular el avance ejecutado (``advance_progress``) sin depender de Qt.
+
+Ojo: GRBL responde "ok" cuando la línea entra al planner, no cuando se ejecuta;
+las confirmaciones son solo una cota superior del avance real.
+
+Los datos se guardan en ``array`` para que un trabajo de ~1M de segmentos
+ocupe pocas decenas de MB.
+
+``ProgressTracker`` vive aquí (sin Qt) porque lo alimenta el hilo lector serial.
+"""
+from __future__ import annotations
+from array import array
+from typing import Iterable, Optional, Tuple
+
+Point = Tuple[float, float]
+
+# BLOCK_BUFFER_SIZE por defecto de GRBL 1.1 (AVR): movimientos que puede haber
+# confirmados ("ok") pero aún sin ejecutar.
+PLANNER_BLOCKS = 16
+# segmentos hacia atrás del último "ok" donde se busca la posición del cabezal
+SEARCH_WINDOW = 256
+# tolerancia (mm²) para considerar empatadas dos distancias
+_TIE_EPS = 1e-9
+
+
+class ToolpathIndex:
+    def __init__(self) -> None:
+        # vértice k = posición tras el movimiento k-1; el vértice 0 es el origen
+        self.xs = array("d", [0.0])
+        self.ys = array("d", [0.0])
+        # 1 si el segmento k (vértice k → k+1) es de corte (G1), 0 si es rápido (G0)
+        self.cut = array("b")
+        # line_end[i] = segmentos completos al terminar la línea i (líneas no vacías)
+        self.line_end = array("q")
+
+    @classmethod
+    def from_gcode(cls, lines: Iterable[str]) -> "ToolpathIndex":
+        """Construye el índice. Las líneas vacías se ignoran, igual que en ``stream_gcode``."""
+        idx = cls()
+        xs, ys, cut, line_end = idx.xs, idx.ys, idx.cut, idx.line_end
+        x = y = 0.0
+        relative = False
+        motion = -1  # modo modal G0/G1
+        for raw in lines:
+            ln = raw.split(";", 1)[0].strip().upper()
+            if not ln:
+                if raw.strip():
+                    line_end.append(len(cut))
+                continue
+            nx: Optional[float] = None
+            ny: Optional[float] = None
+            for w in ln.split():
+                c = w[0]
+                try:
+                    if c == "X":
+                        nx = float(w[1:])
+                    elif c == "Y":
+                        ny = float(w[1:])
+                    elif c == "G":
+                        code = int(float(w[1:]))
+                        if code in (0, 1):
+                            motion = code
+                        elif code == 90:
+                            relative = False
+                        elif code == 91:
+                            relative = True
+                except ValueError:
+                    continue
+            if motion in (0, 1) and (nx is not None or ny is not None):
+                if relative:
+                    tx, ty = x + (nx or 0.0), y + (ny or 0.0)
+                else:
+                    tx = x if nx is None else nx
+                    ty = y if ny is None else ny
+                if (tx, ty) != (x, y):
+                    xs.append(tx); ys.append(ty)
+                    cut.append(1 if motion == 1 else 0)
+                    x, y = tx, ty
+            line_end.append(len(cut))
+        return idx
+
+    @property
+    def segment_count(self) -> int:
+        return len(self.cut)
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_end)
+
+    def segments_for_lines(self, acked: int) -> int:
+        """Segmentos cubiertos tras ``acked`` líneas confirmadas (cota superior del avance)."""
+        if acked <= 0:
+            return 0
+        return self.line_end[min(acked, len(self.line_end)) - 1]
+
+    def locate(self, x: float, y: float, lo: int, hi: int) -> Tuple[int, float]:
+        """
+        Segmento más cercano a (x, y) dentro de [lo, hi).
+
+        Devuelve ``(segmento, t)`` con t ∈ [0, 1] la fracción recorrida. Si la
+        ventana está vacía devuelve ``(lo, 0.0)``. En empates gana el segmento
+        más temprano: en una figura cerrada el punto inicial y el final coinciden
+        y, como el avance nunca retrocede, elegir el final la daría por cortada.
+        """
+        xs, ys = self.xs, self.ys
+        lo = max(0, lo)
+        hi = min(hi, len(self.cut))
+        best, best_t, best_d = lo, 0.0, float("inf")
+        for k in range(lo, hi):
+            ax, ay = xs[k], ys[k]
+            dx, dy = xs[k + 1] - ax, ys[k + 1] - ay
+            l2 = dx * dx + dy * dy
+            t = 0.0 if l2 == 0.0 else ((x - ax) * dx + (y - ay) * dy) / l2
+            if t < 0.0:
+                t = 0.0
+            elif t > 1.0:
+                t = 1.0
+            ex, ey = ax + t * dx - x, ay + t * dy - y
+            d = ex * ex + ey * ey
+            if d < best_d - _TIE_EPS:
+                best, best_t, best_d = k, t, d
+        return best, best_t
+
+    def point_at(self, seg: int, t: float) -> Point:
+        ax, ay = self.xs[seg], self.ys[seg]
+        return ax + t * (self.xs[seg + 1] - ax), ay + t * (self.ys[seg + 1] - ay)
+
+
+def advance_progress(idx: ToolpathIndex, acked: int, pos: Optional[Point],
+                     done: int, frac: float, finished: bool = False,
+                     window: int = SEARCH_WINDOW,
+                     planner_blocks: int = PLANNER_BLOCKS) -> Tuple[int, float]:
+    """
+    Nuevo avance ``(segmento, t)`` a partir del anterior ``(done, frac)``; nunca retrocede.
+
+    - ``finished``: la máquina quedó en Idle tras el último "ok" → todo completo.
+    - Con posición: se ubica en los segmentos ya confirmados a partir de ``done``.
+    - Sin posición (p.ej. aún no llegó el WCO): solo se da por hecho lo que ya
+      no puede estar en el planner, ``planner_blocks`` segmentos detrás del "ok".
+    """
+    if finished:
+        return idx.segment_count, 0.0
+    upper = idx.segments_for_lines(acked)
+    if pos is not None:
+        if upper > done:
+            lo = max(done, upper - window)
+            seg, t = idx.locate(pos[0], pos[1], lo, upper)
+            if (seg, t) > (done, frac):
+                return seg, t
+    else:
+        lower = upper - planner_blocks
+        if lower > done:
+            return lower, 0.0
+    return done, frac
+
+
+def _parse_xy(field: str) -> Point:
+    x, y = field.split(",")[:2]
+    return float(x), float(y)
+
+
+class ProgressTracker:
+    """
+    Estado mínimo del trabajo en curso, escrito por un solo hilo (el lector serial).
+
+    ``pos`` está en coordenadas de trabajo, las mismas del G-code: se usa ``WPos``
+    tal cual o ``MPos - WCO`` con el último ``WCO`` recibido (GRBL lo manda solo
+    cada varios reportes). Mientras no se conozca el ``WCO``, un ``MPos`` no
+    actualiza ``pos``.
+
+    ``finished`` se activa con el primer reporte ``Idle`` posterior a
+    ``mark_stream_done()``: recién ahí la máquina vació el planner.
+    """
+
+    def __init__(self) -> None:
+        self.armed = False
+        self.acked = 0
+        self.pos: Optional[Point] = None
+        self.state = ""
+        self.stream_done = False
+        self.finished = False
+        # el WCO es estado de la máquina: se conserva entre trabajos
+        self.wco: Optional[Point] = None
+
+    def arm(self) -> None:
+        self.acked = 0
+        self.pos = None
+        self.stream_done = False
+        self.finished = False
+        self.armed = True
+
+    def mark_stream_done(self) -> None:
+        """Se llamó tras el último "ok"; a partir de aquí un ``Idle`` cierra el trabajo."""
+        self.stream_done = True
+
+    def disarm(self) -> None:
+        self.armed = False
+
+    def feed(self, text: str) -> None:
+        if text.startswith("<"):
+            # <Run|MPos:1.000,2.000,0.000|FS:500,0|WCO:0.000,0.000,0.000>
+            mpos = wpos = None
+            try:
+                for field in text.strip("<>").split("|"):
+                    if field.startswith("MPos:"):
+                        mpos = _parse_xy(field[5:])
+                    elif field.startswith("WPos:"):
+                        wpos = _parse_xy(field[5:])
+                    elif field.startswith("WCO:"):
+                        self.wco = _parse_xy(field[4:])
+            except ValueError:
+                return
+            if not self.armed:
+                return
+            # "Run", "Idle", "Hold:0"...
+            self.state = text[1:].split("|", 1)[0].split(":", 1)[0].rstrip(">")
+            if self.stream_done and self.state == "Idle":
+                self.finished = True
+            if wpos is not None:
+                self.pos = wpos
+            elif mpos is not None and self.wco is not None:
+                self.pos = (mpos[0] - self.wco[0], mpos[1] - self.wco[1])
+        elif self.armed and (text == "ok" or text.startswith("error")):
+            self.acked += 1
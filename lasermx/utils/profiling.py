@@ -0,0 +1,222 @@
+"""
+Instrumentación por etapas del pipeline (carga → muestreo → G-code → archivo).
+
+Uso dentro del pipeline:
+
+    with stage("svg.sample") as sp:
+        ...
+        sp.count(paths=len(paths), points=n)
+
+Cuando nadie escucha, ``stage()`` devuelve un span nulo compartido: el costo es
+una comprobación de bandera y un ``with`` vacío.
+
+Uso desde código que embebe LaserMX:
+
+    def on_stage(t: StageTiming) -> None:
+        print(t.name, t.wall_s)
+    subscribe(on_stage)
+
+``enable()`` además guarda cada medición para ``summary_table()`` / ``write_chrome_trace()``.
+La memoria por etapa solo se mide con ``enable(trace_memory=True)`` (o si ya hay
+``tracemalloc`` activo): ``tracemalloc`` encarece cada asignación, así que infla
+mucho más los tiempos de las etapas en Python puro (p.ej. formateo de G-code) que
+los de I/O o extensiones en C, y el reparto de tiempos deja de ser fiable.
+"""
+from __future__ import annotations
+import json
+import os
+import threading
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+@dataclass
+class StageTiming:
+    name: str
+    start_s: float           # perf_counter al iniciar
+    wall_s: float
+    cpu_s: float
+    alloc_bytes: Optional[int]  # cambio neto de memoria; None si no se mide memoria
+    peak_bytes: Optional[int]   # pico por encima del inicio de la etapa; None si no se mide memoria
+    counts: Dict[str, int] = field(default_factory=dict)
+    thread_id: int = 0
+
+StageHook = Callable[[StageTiming], None]
+
+_hooks: List[StageHook] = []
+_records: List[StageTiming] = []
+_recording = False
+_active = False
+_own_tracemalloc = False
+_lock = threading.Lock()
+_local = threading.local()  # pila de spans abiertos por hilo (picos de memoria anidados)
+
+def _update_active() -> None:
+    global _active
+    _active = _recording or bool(_hooks)
+
+class _NullSpan:
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def count(self, **items: int) -> None:
+        pass
+
+_NULL_SPAN = _NullSpan()
+
+class _Span:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.counts: Dict[str, int] = {}
+        self._peak = 0
+
+    def count(self, **items: int) -> None:
+        for k, v in items.items():
+            self.counts[k] = self.counts.get(k, 0) + int(v)
+
+    def __enter__(self) -> "_Span":
+        self._mem0 = None
+        if tracemalloc.is_tracing():
+            cur, peak = tracemalloc.get_traced_memory()
+            stack = _span_stack()
+            # reset_peak() es global: antes de reiniciarlo se lo pasamos a los spans abiertos
+            for parent in stack:
+                parent._peak = max(parent._peak, peak)
+            stack.append(self)
+            tracemalloc.reset_peak()
+            self._mem0 = cur
+            self._peak = cur
+        self._cpu0 = time.thread_time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        wall = time.perf_counter() - self._t0
+        cpu = time.thread_time() - self._cpu0
+        alloc = peak_bytes = None
+        if self._mem0 is not None:
+            stack = _span_stack()
+            if stack and stack[-1] is self:
+                stack.pop()
+            if tracemalloc.is_tracing():
+                cur, peak = tracemalloc.get_traced_memory()
+                self._peak = max(self._peak, peak)
+                for parent in stack:
+                    parent._peak = max(parent._peak, self._peak)
+                alloc = cur - self._mem0
+                peak_bytes = self._peak - self._mem0
+        _emit(StageTiming(self.name, self._t0, wall, cpu, alloc, peak_bytes, self.counts,
+                          threading.get_ident()))
+
+def _span_stack() -> List[_Span]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+def stage(name: str):
+    """Context manager que mide una etapa; no-op si el profiling está apagado."""
+    if not _active:
+        return _NULL_SPAN
+    return _Span(name)
+
+def _emit(t: StageTiming) -> None:
+    if _recording:
+        with _lock:
+            _records.append(t)
+    for hook in list(_hooks):
+        try:
+            hook(t)
+        except Exception:
+            # un hook defectuoso no debe romper la conversión
+            pass
+
+def subscribe(hook: StageHook) -> None:
+    if hook not in _hooks:
+        _hooks.append(hook)
+    _update_active()
+
+def unsubscribe(hook: StageHook) -> None:
+    try:
+        _hooks.remove(hook)
+    except ValueError:
+        pass
+    _update_active()
+
+def enable(trace_memory: bool = False) -> None:
+    """Empieza a guardar mediciones; ``trace_memory`` activa tracemalloc (mucho overhead)."""
+    global _recording, _own_tracemalloc
+    _recording = True
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _own_tracemalloc = True
+    _update_active()
+
+def disable() -> None:
+    global _recording, _own_tracemalloc
+    _recording = False
+    if _own_tracemalloc:
+        tracemalloc.stop()
+        _own_tracemalloc = False
+    _update_active()
+
+def records() -> List[StageTiming]:
+    with _lock:
+        return list(_records)
+
+def reset() -> None:
+    with _lock:
+        _records.clear()
+
+def _kib(v: Optional[int]) -> str:
+    return "-" if v is None else f"{v / 1024:.1f}"
+
+def summary_table(recs: Optional[List[StageTiming]] = None) -> str:
+    """Tabla de texto agregada por etapa (llamadas, pared, CPU, memoria, conteos)."""
+    recs = records() if recs is None else recs
+    agg: Dict[str, dict] = {}
+    for r in recs:
+        a = agg.setdefault(r.name, {"calls": 0, "wall": 0.0, "cpu": 0.0, "alloc": None, "peak": None, "counts": {}})
+        a["calls"] += 1
+        a["wall"] += r.wall_s
+        a["cpu"] += r.cpu_s
+        if r.alloc_bytes is not None:
+            a["alloc"] = (a["alloc"] or 0) + r.alloc_bytes
+        if r.peak_bytes is not None:
+            a["peak"] = max(a["peak"] or 0, r.peak_bytes)
+        for k, v in r.counts.items():
+            a["counts"][k] = a["counts"].get(k, 0) + v
+    head = (f"{'Etapa':<16} {'Llamadas':>8} {'Pared ms':>10} {'CPU ms':>10} "
+            f"{'Pico KiB':>10} {'Neto KiB':>10}  Conteos")
+    rows = [head, "-" * len(head)]
+    for name, a in agg.items():
+        counts = ", ".join(f"{k}={v}" for k, v in a["counts"].items())
+        rows.append(f"{name:<16} {a['calls']:>8} {a['wall'] * 1e3:>10.2f} {a['cpu'] * 1e3:>10.2f} "
+                    f"{_kib(a['peak']):>10} {_kib(a['alloc']):>10}  {counts}")
+    if any(a["peak"] is not None for a in agg.values()):
+        rows.append("Nota: memoria medida con tracemalloc; los tiempos incluyen su overhead, "
+                    "que es mayor en etapas Python puro que en I/O o extensiones en C.")
+    return "\n".join(rows)
+
+def write_chrome_trace(path: str, recs: Optional[List[StageTiming]] = None) -> None:
+    """Guarda las mediciones en formato Chrome Trace (chrome://tracing, Perfetto)."""
+    recs = records() if recs is None else recs
+    events = []
+    for r in recs:
+        args: Dict[str, object] = dict(r.counts)
+        args["cpu_ms"] = round(r.cpu_s * 1e3, 3)
+        if r.alloc_bytes is not None:
+            args["alloc_bytes"] = r.alloc_bytes
+        if r.peak_bytes is not None:
+            args["peak_bytes"] = r.peak_bytes
+        events.append({
+            "name": r.name, "cat": "pipeline", "ph": "X",
+            "ts": r.start_s * 1e6, "dur": r.wall_s * 1e6,
+            "pid": os.getpid(), "tid": r.thread_id, "args": args,
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f, indent=1)
@@ -0,0 +1,131 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from lasermx.drivers.grbl_serial import GrblSerialDriver, StreamAborted
+
+
+class StubSerial:
+    """Serial simulado: responde "ok" a cada línea salvo las de ``hold``."""
+
+    def __init__(self, hold=()):
+        self.written = []
+        self.hold = set(hold)
+        self._rx = queue.Queue()
+        self.in_waiting = 0
+
+    def write(self, data):
+        self.written.append(data)
+        line = data.decode().strip()
+        if data.endswith(b"\n") and line not in self.hold:
+            self._rx.put(b"ok\r\n")
+
+    def flush(self):
+        pass
+
+    def readline(self):
+        try:
+            return self._rx.get(timeout=0.05)
+        except queue.Empty:
+            return b""
+
+    def reply(self, line):
+        self._rx.put(line.encode() + b"\r\n")
+
+    def close(self):
+        pass
+
+
+def make_driver(stub):
+    lines = []
+    drv = GrblSerialDriver(on_line=lines.append)
+    drv._ser = stub
+    drv._rx_thread = threading.Thread(target=drv._reader_loop, daemon=True)
+    drv._rx_thread.start()
+    return drv, lines
+
+
+def run_in_thread(fn, *args, **kwargs):
+    result = {}
+
+    def target():
+        try:
+            result["value"] = fn(*args, **kwargs)
+        except Exception as e:
+            result["error"] = e
+
+    thr = threading.Thread(target=target, daemon=True)
+    thr.start()
+    return thr, result
+
+
+def test_stream_waits_for_ack_and_skips_empty_lines():
+    stub = StubSerial()
+    drv, lines = make_driver(stub)
+    try:
+        sent = drv.stream_gcode(["G90", "", "   ", "G1 X1 Y1 F100", "M5"])
+    finally:
+        drv.disconnect()
+    assert sent == 3
+    assert stub.written == [b"G90\n", b"G1 X1 Y1 F100\n", b"M5\n"]
+    assert lines.count("ok") == 3
+
+
+def test_stream_does_not_send_next_line_before_ack():
+    stub = StubSerial(hold={"G1 X50 F100"})
+    drv, _ = make_driver(stub)
+    thr, result = run_in_thread(drv.stream_gcode, ["G90", "G1 X50 F100", "M5"])
+    try:
+        time.sleep(0.3)
+        assert stub.written == [b"G90\n", b"G1 X50 F100\n"]
+        stub.reply("ok")
+        thr.join(2)
+        assert result == {"value": 3}
+    finally:
+        drv.disconnect()
+
+
+def test_status_reports_keep_timeout_alive():
+    stub = StubSerial(hold={"G1 X50 F100"})
+    drv, _ = make_driver(stub)
+    thr, result = run_in_thread(drv.stream_gcode, ["G1 X50 F100"], timeout=0.4)
+    try:
+        # un movimiento largo: no llega "ok", pero sí reportes de estado
+        for _ in range(6):
+            time.sleep(0.15)
+            stub.reply("<Run|MPos:1.000,0.000,0.000|FS:100,0>")
+        assert thr.is_alive()
+        stub.reply("ok")
+        thr.join(2)
+        assert result == {"value": 1}
+    finally:
+        drv.disconnect()
+
+
+def test_timeout_soft_resets_machine():
+    stub = StubSerial(hold={"G1 X50 F100"})
+    drv, _ = make_driver(stub)
+    try:
+        with pytest.raises(TimeoutError):
+            drv.stream_gcode(["G1 X50 F100"], timeout=0.3)
+    finally:
+        drv.disconnect()
+    assert stub.written[-1] == b"\x18"
+
+
+@pytest.mark.parametrize("stopper", ["abort_stream", "disconnect"])
+def test_abort_raises_and_soft_resets(stopper):
+    stub = StubSerial(hold={"G1 X50 F100"})
+    drv, _ = make_driver(stub)
+    thr, result = run_in_thread(drv.stream_gcode, ["G1 X50 F100", "M5"])
+    try:
+        time.sleep(0.2)
+        getattr(drv, stopper)()
+        thr.join(2)
+    finally:
+        drv.disconnect()
+    assert isinstance(result.get("error"), StreamAborted)
+    assert b"\x18" in stub.written
+    assert b"M5\n" not in stub.written
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from lasermx.pipeline.gcode_generator import polylines_to_gcode
+from lasermx.utils import profiling
+
+
+@pytest.fixture(autouse=True)
+def clean_profiling():
+    yield
+    profiling.disable()
+    for hook in list(profiling._hooks):
+        profiling.unsubscribe(hook)
+    profiling.reset()
+
+
+def test_stage_is_shared_null_span_when_disabled():
+    assert profiling.stage("a") is profiling._NULL_SPAN
+    with profiling.stage("a") as sp:
+        sp.count(paths=3)
+    assert profiling.records() == []
+
+
+def test_subscribe_toggles_active():
+    seen = []
+    profiling.subscribe(seen.append)
+    assert profiling._active
+    assert profiling.stage("a") is not profiling._NULL_SPAN
+    profiling.unsubscribe(seen.append)
+    assert not profiling._active
+    assert profiling.stage("a") is profiling._NULL_SPAN
+
+
+def test_hook_receives_counts():
+    seen = []
+    profiling.subscribe(seen.append)
+    polylines_to_gcode([[(0, 0), (1, 0), (1, 1)]])
+    (t,) = seen
+    assert t.name == "gcode.generate"
+    assert t.counts == {"paths": 1, "points": 3, "lines": 7}
+    assert t.wall_s >= 0 and t.cpu_s >= 0
+    # sin tracemalloc no se mide memoria
+    assert t.alloc_bytes is None and t.peak_bytes is None
+
+
+def test_failing_hook_does_not_break_pipeline():
+    def boom(t):
+        raise RuntimeError("hook roto")
+
+    profiling.subscribe(boom)
+    assert polylines_to_gcode([[(0, 0), (1, 0)]])[-1] == "M5"
+
+
+def test_memory_peak_reported_when_freed():
+    profiling.enable(trace_memory=True)
+    with profiling.stage("tmp"):
+        data = [bytes(1024) for _ in range(1000)]
+        del data
+    (r,) = profiling.records()
+    assert r.peak_bytes > 900 * 1024
+    assert r.alloc_bytes < r.peak_bytes
+
+
+def test_nested_spans_keep_outer_peak():
+    profiling.enable(trace_memory=True)
+    with profiling.stage("outer"):
+        data = [bytes(1024) for _ in range(1000)]
+        del data
+        with profiling.stage("inner"):
+            pass
+    inner, outer = profiling.records()
+    assert inner.name == "inner" and outer.name == "outer"
+    assert outer.peak_bytes > 900 * 1024
+    assert inner.peak_bytes < outer.peak_bytes
+
+
+def test_summary_table_and_chrome_trace(tmp_path):
+    profiling.enable()
+    polylines_to_gcode([[(0, 0), (1, 0)]])
+    polylines_to_gcode([[(0, 0), (1, 0), (2, 0)]])
+    table = profiling.summary_table()
+    lines = table.splitlines()
+    assert lines[0].startswith("Etapa")
+    row = next(ln for ln in lines if ln.startswith("gcode.generate"))
+    assert row.split()[1] == "2"
+    assert "paths=2, points=5, lines=13" in row
+    assert "tracemalloc" not in table
+
+    out = tmp_path / "trace.json"
+    profiling.write_chrome_trace(str(out))
+    events = json.loads(out.read_text(encoding="utf-8"))["traceEvents"]
+    assert [e["name"] for e in events] == ["gcode.generate", "gcode.generate"]
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in events)
+    assert events[1]["args"]["points"] == 3
+
+
+def test_summary_table_notes_memory_overhead():
+    profiling.enable(trace_memory=True)
+    with profiling.stage("tmp"):
+        pass
+    assert "tracemalloc" in profiling.summary_table()
@@ -0,0 +1,164 @@
+from lasermx.pipeline.gcode_generator import polylines_to_gcode
+from lasermx.pipeline.toolpath_index import ProgressTracker, ToolpathIndex, advance_progress
+
+SQUARE = [(5, 5), (15, 5), (15, 15), (5, 15), (5, 5)]
+
+
+def test_from_gcode_tracks_modal_motion_and_line_ends():
+    idx = ToolpathIndex.from_gcode([
+        "G90",
+        "G0 X10 Y0",
+        "G1 X10 Y10 F500",
+        "X0",              # sigue en G1 (modal)
+        "G91",
+        "G0 X5 Y5",        # relativo → (5, 15)
+        "G90 G1 X0 Y0",
+    ])
+    assert idx.segment_count == 5
+    assert list(idx.cut) == [0, 1, 1, 0, 1]
+    assert (idx.xs[4], idx.ys[4]) == (5.0, 15.0)
+    assert list(idx.line_end) == [0, 1, 2, 3, 3, 4, 5]
+
+
+def test_from_gcode_counts_lines_like_stream_gcode():
+    # las vacías no se envían; las de solo comentario sí (GRBL responde "ok")
+    idx = ToolpathIndex.from_gcode(["G90", "", "   ", "; comentario", "G1 X1 Y0"])
+    assert idx.line_count == 3
+    assert list(idx.line_end) == [0, 0, 1]
+
+
+def test_from_gcode_skips_zero_length_moves():
+    idx = ToolpathIndex.from_gcode(["G0 X0 Y0", "G1 X0 Y0", "G1 X1"])
+    assert idx.segment_count == 1
+    assert list(idx.line_end) == [0, 0, 1]
+
+
+def test_segments_for_lines_clamps():
+    g = polylines_to_gcode([[(0, 0), (10, 0), (10, 10)]])
+    idx = ToolpathIndex.from_gcode(g)
+    assert idx.segments_for_lines(0) == 0
+    assert idx.segments_for_lines(-3) == 0
+    assert idx.segments_for_lines(idx.line_count + 10) == idx.segment_count
+
+
+def test_locate_projects_onto_segment():
+    idx = ToolpathIndex.from_gcode(["G1 X10 Y0", "G1 X10 Y10"])
+    assert idx.locate(4.0, 1.0, 0, idx.segment_count) == (0, 0.4)
+    assert idx.locate(11.0, 5.0, 0, idx.segment_count) == (1, 0.5)
+    assert idx.point_at(1, 0.5) == (10.0, 5.0)
+
+
+def test_locate_prefers_earlier_segment_on_ties_and_respects_window():
+    idx = ToolpathIndex.from_gcode(["G1 X10 Y0", "G1 X10 Y10"])
+    # el vértice compartido (10, 0) empata: se queda en el segmento más temprano
+    assert idx.locate(10.0, 0.0, 0, 2) == (0, 1.0)
+    # la ventana limita la búsqueda aunque haya un segmento más cercano fuera
+    assert idx.locate(10.0, 8.0, 0, 1) == (0, 1.0)
+    assert idx.locate(0.0, 0.0, 5, 5) == (5, 0.0)
+
+
+def test_locate_closed_polygon_start_is_not_end():
+    # regresión: inicio y fin del cuadrado coinciden; no debe darse por cortado
+    g = polylines_to_gcode([SQUARE])
+    idx = ToolpathIndex.from_gcode(g)
+    assert list(idx.cut) == [0, 1, 1, 1, 1]
+    assert idx.locate(5, 5, 0, idx.segments_for_lines(len(g))) == (0, 1.0)
+    assert advance_progress(idx, len(g), (5.0, 5.0), 0, 0.0) == (0, 1.0)
+    # mismo cuadrado como cuatro LINE sueltas (p.ej. desde DXF)
+    sides = [[SQUARE[i], SQUARE[i + 1]] for i in range(4)]
+    g = polylines_to_gcode(sides)
+    idx = ToolpathIndex.from_gcode(g)
+    assert idx.segment_count == 5
+    assert advance_progress(idx, len(g), (5.0, 5.0), 0, 0.0) == (0, 1.0)
+
+
+def test_advance_progress_follows_position_with_buffered_acks():
+    g = polylines_to_gcode([SQUARE])
+    idx = ToolpathIndex.from_gcode(g)
+    # GRBL ya confirmó todo (entró al planner) pero el cabezal va por el primer lado
+    acked = len(g)
+    done, frac = advance_progress(idx, acked, (5.0, 5.0), 0, 0.0)
+    done, frac = advance_progress(idx, acked, (10.0, 5.0), done, frac)
+    assert (done, frac) == (1, 0.5)
+    # un reporte viejo no hace retroceder
+    assert advance_progress(idx, acked, (5.0, 5.0), done, frac) == (1, 0.5)
+    done, frac = advance_progress(idx, acked, (15.0, 12.0), done, frac)
+    assert (done, frac) == (2, 0.7)
+    # de vuelta al inicio: ahora sí es el último lado
+    done, frac = advance_progress(idx, acked, (5.0, 5.0), done, frac)
+    assert (done, frac) == (4, 1.0)
+    # todo confirmado no alcanza: solo "finished" (Idle) completa el trabajo
+    assert advance_progress(idx, acked, None, done, frac) == (4, 1.0)
+    assert advance_progress(idx, acked, None, done, frac, finished=True) == (5, 0.0)
+
+
+def test_advance_progress_without_position_stays_behind_planner():
+    g = ["G90"] + [f"G1 X{i + 1} Y0 F100" for i in range(40)]
+    idx = ToolpathIndex.from_gcode(g)
+    assert advance_progress(idx, 10, None, 0, 0.0) == (0, 0.0)
+    assert advance_progress(idx, 30, None, 0, 0.0) == (29 - 16, 0.0)
+    assert advance_progress(idx, 30, None, 20, 0.5) == (20, 0.5)
+
+
+def test_advance_progress_ignores_unacked_segments():
+    g = ["G90"] + [f"G1 X{i + 1} Y0 F100" for i in range(40)]
+    idx = ToolpathIndex.from_gcode(g)
+    # el cabezal no puede estar en un segmento que aún no se envió
+    assert advance_progress(idx, 5, (30.0, 0.0), 0, 0.0) == (3, 1.0)
+
+
+def test_tracker_ignores_lines_when_disarmed():
+    tr = ProgressTracker()
+    tr.feed("ok")
+    tr.feed("<Idle|MPos:1.000,2.000,0.000|FS:0,0>")
+    assert tr.acked == 0 and tr.pos is None
+
+
+def test_tracker_counts_acks_and_errors():
+    tr = ProgressTracker()
+    tr.arm()
+    for ln in ("ok", "error:20", "[MSG:x]", "ok"):
+        tr.feed(ln)
+    assert tr.acked == 3
+
+
+def test_tracker_uses_wpos_as_is():
+    tr = ProgressTracker()
+    tr.arm()
+    tr.feed("<Run|WPos:1.500,-2.000,0.000|FS:500,0>")
+    assert tr.pos == (1.5, -2.0)
+
+
+def test_tracker_subtracts_last_wco_from_mpos():
+    tr = ProgressTracker()
+    # el WCO se recuerda aunque llegue antes de armar
+    tr.feed("<Idle|MPos:0.000,0.000,0.000|FS:0,0|WCO:10.000,20.000,0.000>")
+    tr.arm()
+    tr.feed("<Run|MPos:15.000,25.000,0.000|FS:500,0>")
+    assert tr.pos == (5.0, 5.0)
+    tr.feed("<Run|MPos:15.000,25.000,0.000|FS:500,0|WCO:0.000,0.000,0.000>")
+    assert tr.pos == (15.0, 25.0)
+
+
+def test_tracker_waits_for_wco_before_using_mpos():
+    tr = ProgressTracker()
+    tr.arm()
+    tr.feed("<Run|MPos:15.000,25.000,0.000|FS:500,0>")
+    assert tr.pos is None
+    tr.feed("<Run|MPos:bad|FS:500,0>")
+    assert tr.pos is None
+
+
+def test_tracker_finishes_on_idle_after_stream_done():
+    tr = ProgressTracker()
+    tr.arm()
+    tr.feed("<Idle|WPos:0.000,0.000,0.000|FS:0,0>")
+    assert tr.state == "Idle" and not tr.finished
+    tr.mark_stream_done()
+    tr.feed("<Run|WPos:1.000,0.000,0.000|FS:100,0>")
+    tr.feed("<Hold:0|WPos:1.000,0.000,0.000|FS:0,0>")
+    assert tr.state == "Hold" and not tr.finished
+    tr.feed("<Idle|WPos:2.000,0.000,0.000|FS:0,0>")
+    assert tr.finished
+    tr.arm()
+    assert not tr.finished and not tr.stream_done